@@ -447,7 +447,7 @@ def import_modules() -> bool:
     modules_to_import = {
         'topic_rotator': ['get_today_topic'],
         'scripting': ['generate_script'],
-        'voice': ['generate_voice'],
+        'voice': ['generate_voice', 'start_tts_warmup'],
         'video': ['create_video'],
         'thumbnail_generator': ['generate_image_sequence'],
         'youtube_uploader': ['YouTubeUploader', 'generate_video_metadata']
@@ -576,6 +576,9 @@ def generate_content_with_retry(topic: str, category: str) -> Tuple[str, str, li
         cleanup_files.append(video_path)
         return video_path
     
+    # Load the TTS model while the script is written; a no-op on hosts without an NVIDIA driver
+    start_tts_warmup()
+    
     script = retry_on_failure(generate_script_step)
     logger.info(f"✅ Script generated ({len(script)} characters)")
     
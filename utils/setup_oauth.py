@@ -9,7 +9,6 @@ import os
 import logging
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
-import pickle
 
 # Configure logging
 logging.basicConfig(
@@ -34,9 +33,9 @@ def setup_oauth(credentials_path='credentials.json', token_path='token.pickle'):
         flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
         credentials = flow.run_local_server(port=0)
 
-        # Save the credentials to token.pickle
-        with open(token_path, 'wb') as token:
-            pickle.dump(credentials, token)
+        # Save the credentials to token.pickle as authorized-user JSON
+        with open(token_path, 'w', encoding='utf-8') as token:
+            token.write(credentials.to_json())
             logger.info(f"✅ Saved OAuth 2.0 token to {token_path}")
 
         logger.info("🎉 OAuth 2.0 setup completed successfully!")
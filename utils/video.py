@@ -418,11 +418,8 @@ def create_video(audio_path: str, image_paths: list, output_dir: str, script_tex
             success = safe_write_videofile(
                 video,
                 output_path,
-                codec="libx264",
                 audio_codec="aac",
-                preset="ultrafast",
                 bitrate="2000k",
-                threads=2,
                 fps=30
             )
 
@@ -4,24 +4,461 @@ MoviePy Audio Fix - Addresses errors in audio and video clip processing
 """
 
 import os
+import json
 import logging
 import moviepy
 from moviepy.editor import *
-from moviepy.audio.AudioClip import AudioClip
+from moviepy.audio.AudioClip import AudioClip, AudioArrayClip
 from moviepy.video.VideoClip import VideoClip
 import numpy as np
-from gtts import gTTS
-from TTS.api import TTS
 from pathlib import Path
-from datetime import datetime
 import time
-from pydub import AudioSegment
+import subprocess
+import tempfile
+import multiprocessing
+import shutil
+import threading
+import functools
+import hashlib
+import contextlib
+import atexit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 
 logger = logging.getLogger(__name__)
 
 # Log MoviePy version for debugging
 logger.info(f"MoviePy version: {moviepy.__version__}")
 
+# Hardware H.264 encoders in order of preference, falling back to libx264
+HW_ENCODERS = ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox']
+
+# Encoder presets per SHORTS_QUALITY level (draft favours speed, final favours size/quality)
+ENCODER_PRESETS = {
+    'draft': {'libx264': 'ultrafast', 'h264_nvenc': 'p1'},
+    'balanced': {'libx264': 'veryfast', 'h264_nvenc': 'p3'},
+    'final': {'libx264': 'medium', 'h264_nvenc': 'p5'},
+}
+
+def _encoder_works(encoder: str) -> bool:
+    """
+    Check that an encoder can actually encode here; builds list HW encoders even without the hardware.
+    
+    Args:
+        encoder: ffmpeg encoder name
+        
+    Returns:
+        bool: True if a one-frame test encode succeeds
+    """
+    try:
+        result = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), '-hide_banner', '-loglevel', 'error',
+             '-f', 'lavfi', '-i', 'color=s=64x64', '-frames:v', '1', '-c:v', encoder, '-f', 'null', '-'],
+            capture_output=True, timeout=15
+        )
+        return result.returncode == 0
+    except Exception as e:
+        logger.debug(f"Test encode with {encoder} failed: {e}")
+        return False
+
+def _detect_hwenc() -> str:
+    """
+    Probe ffmpeg once for a working hardware H.264 encoder.
+    
+    Returns:
+        str: Encoder name usable as write_videofile codec
+    """
+    try:
+        result = subprocess.run(
+            [get_setting("FFMPEG_BINARY"), '-hide_banner', '-encoders'],
+            capture_output=True, text=True, timeout=10
+        )
+        for encoder in HW_ENCODERS:
+            if encoder in result.stdout and _encoder_works(encoder):
+                logger.info(f"✅ Using hardware encoder: {encoder}")
+                return encoder
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to probe ffmpeg encoders: {e}")
+    return 'libx264'
+
+VIDEO_CODEC = _detect_hwenc()
+
+def get_encoder_params(codec: str = None, bitrate: str = None) -> dict:
+    """
+    Build write_videofile encoder arguments for the given codec and SHORTS_QUALITY.
+    
+    Args:
+        codec: Video codec name (defaults to the detected encoder)
+        bitrate: Caller's target bitrate; when set, no constant-quality flag is added
+        
+    Returns:
+        dict: codec, preset, threads and ffmpeg_params for write_videofile
+    """
+    codec = codec or VIDEO_CODEC
+    quality = os.getenv('SHORTS_QUALITY', 'draft').lower()
+    presets = ENCODER_PRESETS.get(quality, ENCODER_PRESETS['draft'])
+    params = {
+        'codec': codec,
+        'threads': os.cpu_count() or 1,
+        'ffmpeg_params': ['-movflags', '+faststart'],
+    }
+    if codec in presets:
+        params['preset'] = presets[codec]
+    if bitrate:
+        pass  # -crf/-cq would override the requested bitrate
+    elif codec == 'libx264':
+        params['ffmpeg_params'] = ['-crf', '23'] + params['ffmpeg_params']
+    elif codec == 'h264_nvenc':
+        params['ffmpeg_params'] = ['-cq', '23'] + params['ffmpeg_params']
+    return params
+
+# Coqui TTS is only worth trying first on GPU hosts; on CPU gTTS is faster.
+# TTS.api, torch and gtts are imported at first use to keep module import cheap.
+@functools.lru_cache(maxsize=None)
+def _has_gpu() -> bool:
+    """Whether torch is installed and sees a CUDA device."""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def _nvidia_driver_present() -> bool:
+    """Cheap check for an NVIDIA driver, used before paying for a torch import."""
+    return os.path.exists('/proc/driver/nvidia') or shutil.which('nvidia-smi') is not None
+
+def _gpu_available() -> bool:
+    """Whether a CUDA GPU is usable, without importing torch on hosts that have no NVIDIA driver."""
+    return _nvidia_driver_present() and _has_gpu()
+
+TTS_MODEL_NAME = "tts_models/en/ljspeech/tacotron2-DDC"
+GTTS_LANG = 'en'
+GTTS_SLOW = False
+# Optional torch thread cap for TTS inference only (oversubscribed pools slow Tacotron2 on CPU)
+TTS_NUM_THREADS = os.getenv('TTS_NUM_THREADS')
+_TTS_MODEL = None
+_TTS_MODEL_LOCK = threading.Lock()
+
+def _get_tts_model():
+    """
+    Return the shared Mozilla TTS model, loading it (onto the GPU when present) on first use.
+    
+    Returns:
+        TTS model instance
+    """
+    global _TTS_MODEL
+    if _TTS_MODEL is not None:
+        return _TTS_MODEL
+    with _TTS_MODEL_LOCK:
+        if _TTS_MODEL is None:
+            import torch
+            if TTS_NUM_THREADS:
+                torch.set_num_threads(int(TTS_NUM_THREADS))
+                try:
+                    torch.set_num_interop_threads(int(TTS_NUM_THREADS))
+                except RuntimeError:
+                    pass  # Already fixed once inter-op work has started
+            torch.backends.cudnn.benchmark = False  # Variable-length inputs defeat autotuning
+            from TTS.api import TTS
+            model = TTS(model_name=TTS_MODEL_NAME, progress_bar=False)
+            if _has_gpu():
+                model = model.to('cuda')
+                if os.getenv('TTS_HALF_WEIGHTS', 'false').lower() == 'true':
+                    try:
+                        model.synthesizer.tts_model.half()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not cast TTS weights to FP16: {e}")
+            _TTS_MODEL = model
+        return _TTS_MODEL
+
+def _release_tts_model():
+    """Drop the shared TTS model at exit and return its GPU memory to the driver."""
+    global _TTS_MODEL
+    # A daemon thread still loading the model may hold the lock; never block exit on it
+    if not _TTS_MODEL_LOCK.acquire(timeout=1.0):
+        logger.debug("TTS model still loading at exit; skipping release")
+        return
+    try:
+        if _TTS_MODEL is None:
+            return
+        _TTS_MODEL = None
+    finally:
+        _TTS_MODEL_LOCK.release()
+    if _gpu_available():
+        import torch
+        torch.cuda.empty_cache()
+
+atexit.register(_release_tts_model)
+
+def _tts_inference_context():
+    """
+    Context for TTS inference: FP16 autocast without autograd on GPU hosts (TTS_FP16=false disables).
+    
+    Returns:
+        Context manager wrapping a synthesis call
+    """
+    if not _gpu_available() or os.getenv('TTS_FP16', 'true').lower() != 'true':
+        return contextlib.nullcontext()
+    import torch
+    stack = contextlib.ExitStack()
+    stack.enter_context(torch.inference_mode())
+    stack.enter_context(torch.autocast('cuda', dtype=torch.float16))
+    return stack
+
+def _use_mozilla_tts() -> bool:
+    """Whether generate_voice should try Mozilla TTS before gTTS."""
+    return os.getenv('FORCE_COQUI', 'false').lower() == 'true' or _gpu_available()
+
+@functools.lru_cache(maxsize=None)
+def _log_mozilla_skipped():
+    """Say once per process that narration goes straight to gTTS."""
+    logger.info("ℹ️ No GPU available, using gTTS (set FORCE_COQUI=true to use Mozilla TTS)")
+
+def _warm_tts_model():
+    """Load the TTS model on GPU hosts and run one dummy synthesis so the first real call is fast."""
+    try:
+        if not _has_gpu():
+            return
+        with _tts_inference_context():
+            _get_tts_model().tts("warmup")
+        logger.info("✅ Mozilla TTS model warmed up")
+    except Exception as e:
+        logger.warning(f"⚠️ Mozilla TTS warmup failed: {e}")
+
+_TTS_WARMUP_THREAD = None
+
+def start_tts_warmup():
+    """
+    Begin loading the TTS model in the background on NVIDIA hosts; safe to call repeatedly.
+    
+    Call this ahead of narration (e.g. while the script is being generated) so the model
+    load overlaps other work. Importing this module never starts it.
+    """
+    global _TTS_WARMUP_THREAD
+    if _TTS_WARMUP_THREAD is None and _nvidia_driver_present():
+        _TTS_WARMUP_THREAD = threading.Thread(target=_warm_tts_model, name="tts-warmup", daemon=True)
+        _TTS_WARMUP_THREAD.start()
+
+# LRU cache of audio durations keyed by (path, mtime_ns, size), persisted across runs
+_DURATION_CACHE = OrderedDict()
+_DURATION_CACHE_SIZE = 1024
+_DURATION_CACHE_LOCK = threading.Lock()  # _map_clips probes durations from worker threads
+DURATION_CACHE_PATH = Path(os.getenv('VOICE_DURATION_CACHE', '~/.cache/voice_durations.json')).expanduser()
+
+def _load_duration_cache():
+    """Load persisted audio durations into the in-memory cache."""
+    try:
+        with open(DURATION_CACHE_PATH, 'r', encoding='utf-8') as f:
+            for path, mtime_ns, size, duration in json.load(f):
+                _DURATION_CACHE[(path, mtime_ns, size)] = duration
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable duration cache {DURATION_CACHE_PATH}: {e}")
+
+def _save_duration_cache():
+    """Atomically persist the in-memory audio duration cache."""
+    with _DURATION_CACHE_LOCK:
+        entries = [[*key, duration] for key, duration in _DURATION_CACHE.items()]
+    tmp_path = None
+    try:
+        DURATION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name per writer so concurrent saves never share a file
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=DURATION_CACHE_PATH.parent,
+                                         suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            json.dump(entries, f)
+        os.replace(tmp_path, DURATION_CACHE_PATH)
+    except Exception as e:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+        logger.debug(f"Could not persist duration cache: {e}")
+
+_load_duration_cache()
+
+def _probe_duration(path: str) -> float:
+    """
+    Read an audio file's duration from container metadata, decoding only as a last resort.
+    
+    Args:
+        path: Path to audio file
+        
+    Returns:
+        float: Duration in seconds
+    """
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe:
+        try:
+            result = subprocess.run(
+                [ffprobe, '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', path],
+                capture_output=True, text=True, timeout=30, check=True
+            )
+            return float(result.stdout.strip())
+        except (subprocess.SubprocessError, ValueError) as e:
+            logger.debug(f"ffprobe failed for {path}: {e}")
+    # MoviePy's bundled ffmpeg reports the header duration without decoding the stream
+    try:
+        duration = ffmpeg_parse_infos(str(path)).get('duration')
+        if duration:
+            return float(duration)
+    except Exception as e:
+        logger.debug(f"ffmpeg header probe failed for {path}: {e}")
+    return _decoded_duration(path)
+
+def _decoded_duration(path: str, sample_rate: int = 22050) -> float:
+    """
+    Measure duration by decoding to mono s16le PCM and counting bytes as they stream past.
+    
+    Args:
+        path: Path to audio file
+        sample_rate: Rate to resample to while decoding
+        
+    Returns:
+        float: Duration in seconds
+    """
+    proc = subprocess.Popen(
+        [get_setting("FFMPEG_BINARY"), '-v', 'error', '-i', str(path),
+         '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    total = 0
+    with proc.stdout:
+        for chunk in iter(lambda: proc.stdout.read(1 << 20), b''):
+            total += len(chunk)
+    if proc.wait() != 0:
+        raise RuntimeError(f"ffmpeg could not decode {path}")
+    return total / (2 * sample_rate)
+
+def _cached_duration(path: str) -> float:
+    """
+    Return an audio file's duration, reusing earlier probes of the unchanged file.
+    
+    Args:
+        path: Path to audio file
+        
+    Returns:
+        float: Duration in seconds
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _DURATION_CACHE_LOCK:
+        duration = _DURATION_CACHE.get(key)
+        if duration is not None:
+            _DURATION_CACHE.move_to_end(key)
+            return duration
+    
+    duration = _probe_duration(path)
+    with _DURATION_CACHE_LOCK:
+        _DURATION_CACHE[key] = duration
+        if len(_DURATION_CACHE) > _DURATION_CACHE_SIZE:
+            _DURATION_CACHE.popitem(last=False)
+    _save_duration_cache()
+    return duration
+
+# Content-addressed store of generated narration, keyed by SHA-256 of backend settings and script
+NARRATION_CACHE_DIR = Path(os.getenv('NARRATION_CACHE', '~/.cache/narration')).expanduser()
+NARRATION_CACHE_ENABLED = os.getenv('TTS_CACHE_DISABLE', 'false').lower() != 'true'
+NARRATION_CACHE_MAX_BYTES = int(os.getenv('NARRATION_CACHE_MAX_MB', '512')) * 1024 * 1024
+# Temp files older than this are left over from a crashed store and are swept on eviction
+NARRATION_TMP_MAX_AGE = 10 * 60
+
+# Mozilla TTS writes WAV and gTTS writes MP3; each is cached in the format it was produced in,
+# under a key that changes whenever that backend's voice settings do
+NARRATION_FORMATS = {
+    '.wav': TTS_MODEL_NAME,
+    '.mp3': f"gtts|{GTTS_LANG}|slow={GTTS_SLOW}",
+}
+
+def _narration_cache_path(script: str, suffix: str = '.mp3') -> Path:
+    """Cache location for the narration of a script."""
+    key = hashlib.sha256(f"{NARRATION_FORMATS[suffix]}|{script}".encode('utf-8')).hexdigest()
+    return NARRATION_CACHE_DIR / f"{key}{suffix}"
+
+def _restore_cached_narration(script: str, audio_stem: str):
+    """
+    Link (or copy) cached narration for script next to audio_stem, keeping the cached file's format.
+    
+    Args:
+        script: Script text the narration was generated from
+        audio_stem: Output path without extension
+        
+    Returns:
+        str: Path of the restored narration, or None on a cache miss
+    """
+    if not NARRATION_CACHE_ENABLED:
+        return None
+    for suffix in NARRATION_FORMATS:
+        cached = _narration_cache_path(script, suffix)
+        try:
+            if cached.stat().st_size > 0:
+                audio_path = f"{audio_stem}{suffix}"
+                try:
+                    os.link(cached, audio_path)  # Narration is never edited in place, so sharing the inode is safe
+                except OSError:
+                    shutil.copyfile(cached, audio_path)
+                os.utime(cached)  # Mark as recently used for eviction
+                logger.info(f"✅ Reused cached narration: {cached}")
+                return audio_path
+        except OSError:
+            pass
+    return None
+
+def _store_cached_narration(script: str, audio_path: str):
+    """Save generated narration to the cache; failures only cost a future re-synthesis."""
+    if not NARRATION_CACHE_ENABLED:
+        return
+    tmp_path = None
+    try:
+        # An entry over the cap would only evict everything else and then itself
+        if os.stat(audio_path).st_size > NARRATION_CACHE_MAX_BYTES:
+            logger.debug(f"Narration {audio_path} exceeds the cache size cap; not caching")
+            return
+        NARRATION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cached = _narration_cache_path(script, Path(audio_path).suffix)
+        # Unique per writer; the suffix keeps WAV and MP3 entries for one script apart
+        with open(audio_path, 'rb') as src, tempfile.NamedTemporaryFile(
+                dir=NARRATION_CACHE_DIR, suffix=cached.suffix + '.tmp', delete=False) as dst:
+            tmp_path = dst.name
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, cached)
+        tmp_path = None
+        _evict_cached_narration()
+    except OSError as e:
+        logger.debug(f"Could not cache narration: {e}")
+    finally:
+        if tmp_path:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+def _evict_cached_narration():
+    """Delete least recently used narration until the cache fits NARRATION_CACHE_MAX_BYTES."""
+    stale_before = time.time() - NARRATION_TMP_MAX_AGE
+    for path in NARRATION_CACHE_DIR.glob("*.tmp"):
+        with contextlib.suppress(OSError):
+            if path.stat().st_mtime < stale_before:
+                path.unlink()
+    
+    entries = []
+    for suffix in NARRATION_FORMATS:
+        for path in NARRATION_CACHE_DIR.glob(f"*{suffix}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= NARRATION_CACHE_MAX_BYTES:
+            break
+        with contextlib.suppress(OSError):
+            path.unlink()
+            total -= size
+
 def generate_voice(script: str, output_dir: str = "output") -> str:
     """
     Generate voice narration from script text using Mozilla TTS with fallback to gTTS.
@@ -41,74 +478,145 @@ def generate_voice(script: str, output_dir: str = "output") -> str:
         output_dir.mkdir(exist_ok=True)
 
         # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        audio_path = str(output_dir / f"narration_{timestamp}.mp3")
-
-        # Try Mozilla TTS first
-        try:
-            logger.info("🔄 Attempting to use Mozilla TTS...")
-            tts = TTS(model_name="tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False)
-            tts.tts_to_file(text=script, file_path=audio_path)
-            logger.info(f"✅ Mozilla TTS generated audio: {audio_path}")
-            
-            # Validate audio file with pydub
-            try:
-                audio_seg = AudioSegment.from_file(audio_path)
-                duration = len(audio_seg) / 1000.0
-                if duration <= 0:
-                    raise ValueError("Mozilla TTS generated audio with invalid duration")
-                logger.info(f"✅ Audio file validated with pydub: duration={duration:.2f}s")
-            except Exception as validation_error:
-                logger.warning(f"⚠️ Mozilla TTS audio validation failed: {str(validation_error)}")
-                os.remove(audio_path) if os.path.exists(audio_path) else None
-                raise FileNotFoundError("Mozilla TTS generated invalid audio file")
-
-            # Create safe audio clip and verify duration
-            audio_clip = create_safe_audio_clip(audio_path)
-            if audio_clip.duration <= 0:
-                raise ValueError(f"Generated audio has invalid duration: {audio_clip.duration}")
-            
-            audio_clip.close()
-            return audio_path
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        audio_stem = str(output_dir / f"narration_{timestamp}")
 
-        except Exception as tts_error:
-            logger.warning(f"⚠️ Mozilla TTS failed: {str(tts_error)}")
-            logger.info("🔄 Falling back to gTTS...")
+        # Reuse narration previously synthesised for the same script
+        cached_path = _restore_cached_narration(script, audio_stem)
+        if cached_path:
+            return cached_path
 
-            # Fallback to gTTS
+        # Try Mozilla TTS first (GPU hosts only unless FORCE_COQUI=true)
+        if _use_mozilla_tts():
             try:
-                gtts = gTTS(text=script, lang='en', slow=False)
-                gtts.save(audio_path)
-                logger.info(f"✅ gTTS generated audio: {audio_path}")
-
-                # Validate audio file with pydub
+                logger.info("🔄 Attempting to use Mozilla TTS...")
+                # Coqui always writes WAV; name it as such rather than re-encoding to MP3
+                audio_path = f"{audio_stem}.wav"
+                tts = _get_tts_model()
+                with _tts_inference_context():
+                    tts.tts_to_file(text=script, file_path=audio_path)
+                logger.info(f"✅ Mozilla TTS generated audio: {audio_path}")
+                
+                # Validate audio file duration
                 try:
-                    audio_seg = AudioSegment.from_file(audio_path)
-                    duration = len(audio_seg) / 1000.0
+                    duration = _cached_duration(audio_path)
                     if duration <= 0:
-                        raise ValueError("gTTS generated audio with invalid duration")
-                    logger.info(f"✅ Audio file validated with pydub: duration={duration:.2f}s")
+                        raise ValueError("Mozilla TTS generated audio with invalid duration")
+                    logger.info(f"✅ Audio file validated: duration={duration:.2f}s")
                 except Exception as validation_error:
-                    logger.warning(f"⚠️ gTTS audio validation failed: {str(validation_error)}")
-                    os.remove(audio_path) if os.path.exists(audio_path) else None
-                    raise FileNotFoundError("gTTS generated invalid audio file")
+                    logger.warning(f"⚠️ Mozilla TTS audio validation failed: {str(validation_error)}")
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(audio_path)
+                    raise FileNotFoundError("Mozilla TTS generated invalid audio file")
 
-                # Create safe audio clip and verify duration
-                audio_clip = create_safe_audio_clip(audio_path)
-                if audio_clip.duration <= 0:
-                    raise ValueError(f"Generated audio has invalid duration: {audio_clip.duration}")
-
-                audio_clip.close()
+                _store_cached_narration(script, audio_path)
                 return audio_path
 
-            except Exception as gtts_error:
-                logger.error(f"❌ gTTS failed: {str(gtts_error)}")
-                raise RuntimeError("Failed to generate audio with both Mozilla TTS and gTTS")
+            except Exception as tts_error:
+                logger.warning(f"⚠️ Mozilla TTS failed: {str(tts_error)}")
+                logger.info("🔄 Falling back to gTTS...")
+        else:
+            _log_mozilla_skipped()
+
+        # Fallback to gTTS
+        try:
+            audio_path = f"{audio_stem}.mp3"
+            from gtts import gTTS
+            gtts = gTTS(text=script, lang=GTTS_LANG, slow=GTTS_SLOW)
+            with open(audio_path, 'wb', buffering=1 << 20) as audio_file:
+                gtts.write_to_fp(audio_file)
+            logger.info(f"✅ gTTS generated audio: {audio_path}")
+
+            # Validate audio file duration
+            try:
+                duration = _cached_duration(audio_path)
+                if duration <= 0:
+                    raise ValueError("gTTS generated audio with invalid duration")
+                logger.info(f"✅ Audio file validated: duration={duration:.2f}s")
+            except Exception as validation_error:
+                logger.warning(f"⚠️ gTTS audio validation failed: {str(validation_error)}")
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(audio_path)
+                raise FileNotFoundError("gTTS generated invalid audio file")
+
+            _store_cached_narration(script, audio_path)
+            return audio_path
+
+        except Exception as gtts_error:
+            logger.error(f"❌ gTTS failed: {str(gtts_error)}")
+            raise RuntimeError("Failed to generate audio with both Mozilla TTS and gTTS")
 
     except Exception as e:
         logger.error(f"❌ Voice generation failed: {str(e)}", exc_info=True)
         raise
 
+def generate_voices(scripts: list, output_dir: str = "output") -> list:
+    """
+    Generate narration for several scripts, keeping one warm Mozilla TTS model across them.
+    
+    Args:
+        scripts (list): Script texts to convert to audio
+        output_dir (str): Directory to save the audio files
+    
+    Returns:
+        list: Paths to the generated audio files, in script order
+    """
+    if not _use_mozilla_tts():
+        return [generate_voice(script, output_dir) for script in scripts]
+    
+    try:
+        tts = _get_tts_model()
+    except Exception as e:
+        logger.warning(f"⚠️ Mozilla TTS unavailable for batch: {str(e)}")
+        return [generate_voice(script, output_dir) for script in scripts]
+    
+    output_path = Path(output_dir)
+    output_path.mkdir(exist_ok=True)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    
+    audio_paths = []
+    for i, script in enumerate(scripts, 1):
+        audio_stem = str(output_path / f"narration_{timestamp}_{i}")
+        cached_path = _restore_cached_narration(script, audio_stem)
+        if cached_path:
+            audio_paths.append(cached_path)
+            continue
+        audio_path = f"{audio_stem}.wav"
+        try:
+            with _tts_inference_context():
+                tts.tts_to_file(text=script, file_path=audio_path)
+            if _cached_duration(audio_path) <= 0:
+                raise ValueError("Mozilla TTS generated audio with invalid duration")
+            logger.info(f"✅ Mozilla TTS generated audio {i}/{len(scripts)}: {audio_path}")
+            _store_cached_narration(script, audio_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Mozilla TTS failed for script {i}: {str(e)}")
+            audio_path = generate_voice(script, output_dir)
+        audio_paths.append(audio_path)
+    
+    return audio_paths
+
+_SILENT_SAMPLE = np.zeros(2, dtype=np.float32)
+
+def _silent_frame(t):
+    """Vectorized stereo silence: one zero row per requested timestamp."""
+    if np.isscalar(t):
+        return _SILENT_SAMPLE
+    return np.zeros((len(t), 2), dtype=np.float32)
+
+def make_silent_clip(duration, fps=44100):
+    """
+    Create a silent stereo clip that only allocates the chunks MoviePy actually reads.
+    
+    Args:
+        duration: Duration in seconds
+        fps: Sample rate
+        
+    Returns:
+        AudioClip of silence
+    """
+    return AudioClip(make_frame=_silent_frame, duration=float(duration), fps=fps)
+
 def fix_audio_clip_duration(audio_clip, fallback_duration=30.0):
     """
     Fix audio clip duration issues.
@@ -126,7 +634,7 @@ def fix_audio_clip_duration(audio_clip, fallback_duration=30.0):
             try:
                 duration = float(audio_clip.duration)
                 if duration > 0:
-                    logger.info(f"✅ Audio clip has valid duration: {duration:.2f}s")
+                    logger.debug("✅ Audio clip has valid duration: %.2fs", duration)
                     return audio_clip.set_duration(duration)
             except (TypeError, ValueError):
                 logger.warning("⚠️ Invalid duration detected, attempting to fix...")
@@ -136,8 +644,7 @@ def fix_audio_clip_duration(audio_clip, fallback_duration=30.0):
         
         if hasattr(audio_clip, 'filename') and audio_clip.filename:
             try:
-                audio_seg = AudioSegment.from_file(audio_clip.filename)
-                duration = len(audio_seg) / 1000.0
+                duration = _cached_duration(audio_clip.filename)
                 logger.info(f"📊 Calculated duration from file: {duration:.2f}s")
             except Exception as e:
                 logger.warning(f"⚠️ Failed to calculate duration from file: {e}")
@@ -153,7 +660,32 @@ def fix_audio_clip_duration(audio_clip, fallback_duration=30.0):
         
     except Exception as e:
         logger.error(f"❌ Error fixing audio clip duration: {e}")
-        return AudioClip(make_frame=lambda t: np.array([0.0]), duration=fallback_duration)
+        return make_silent_clip(fallback_duration)
+
+def loop_audio_clip(audio_clip, target_duration, fps=None):
+    """
+    Loop an audio clip up to target_duration by tiling its samples once in NumPy.
+    
+    Looping is memory-bound (sample copies, no arithmetic), so the win comes from
+    materialising one contiguous buffer instead of a chain of concatenate/subclip/
+    set_duration clips that MoviePy would re-evaluate per chunk at write time. Both
+    create_safe_audio_clip and safe_write_videofile loop through this helper.
+    
+    Args:
+        audio_clip: MoviePy AudioClip
+        target_duration: Desired duration in seconds
+        fps: Sample rate used to render the clip (defaults to the clip's own rate)
+        
+    Returns:
+        AudioArrayClip of exactly target_duration
+    """
+    fps = fps or getattr(audio_clip, 'fps', None) or 44100
+    samples = audio_clip.to_soundarray(fps=fps)
+    target_samples = int(round(float(target_duration) * fps))
+    # np.resize repeats the samples straight into a buffer of the exact target size,
+    # avoiding the oversized intermediate that np.tile followed by a slice allocates
+    looped = np.resize(samples, (target_samples,) + samples.shape[1:])
+    return AudioArrayClip(looped, fps=fps)
 
 def create_safe_audio_clip(audio_path, target_duration=None):
     """
@@ -166,11 +698,12 @@ def create_safe_audio_clip(audio_path, target_duration=None):
     Returns:
         AudioClip with guaranteed valid duration
     """
+    source_clip = None
     try:
         logger.info(f"🔊 Loading audio file: {audio_path}")
-        audio_clip = AudioFileClip(audio_path)
+        source_clip = AudioFileClip(audio_path)
         
-        audio_clip = fix_audio_clip_duration(audio_clip)
+        audio_clip = fix_audio_clip_duration(source_clip)
         
         if audio_clip.duration is None or audio_clip.duration <= 0:
             raise ValueError(f"Invalid audio duration: {audio_clip.duration}")
@@ -178,14 +711,12 @@ def create_safe_audio_clip(audio_path, target_duration=None):
         if target_duration and abs(float(target_duration) - float(audio_clip.duration)) > 0.01:
             logger.info(f"🔄 Adjusting audio duration from {audio_clip.duration:.2f}s to {target_duration:.2f}s")
             if target_duration > audio_clip.duration:
-                loops_needed = int(np.ceil(target_duration / audio_clip.duration))
-                audio_clip = concatenate_audioclips([audio_clip] * loops_needed)
-                audio_clip = audio_clip.subclip(0, target_duration)
+                audio_clip = loop_audio_clip(audio_clip, target_duration)
+                # The samples now live in the array clip; stop the file's ffmpeg reader
+                source_clip.close()
             else:
                 audio_clip = audio_clip.subclip(0, target_duration)
         
-        audio_clip = audio_clip.set_duration(float(audio_clip.duration))
-        
         debug_audio_clip(audio_clip, f"AudioClip from {audio_path}")
         
         logger.info(f"✅ Created safe audio clip: {audio_clip.duration:.2f}s")
@@ -193,9 +724,46 @@ def create_safe_audio_clip(audio_path, target_duration=None):
         
     except Exception as e:
         logger.error(f"❌ Error creating safe audio clip from {audio_path}: {e}")
+        if source_clip is not None:
+            source_clip.close()
         duration = target_duration if target_duration else 30.0
         logger.warning(f"🔄 Creating silent fallback clip with duration: {duration:.2f}s")
-        return AudioClip(make_frame=lambda t: np.array([0.0]), duration=duration)
+        return make_silent_clip(duration)
+
+def _map_clips(fix_one, clips, needs_fix, in_place=None, max_workers=8, min_parallel=4):
+    """
+    Apply fix_one(index, clip) to the clips that need it, in parallel threads when enough of them do.
+    
+    Clips rejected by needs_fix are kept as they are, so a composite with nothing to fix never
+    starts a pool. Clips selected by in_place (fix_one assigns attributes such as .clips or .mask
+    on them, and clip objects may be shared) are fixed on the calling thread, as are all clips
+    when fewer than min_parallel could run in threads.
+    
+    Args:
+        fix_one: Callable taking (index, clip) and returning the fixed clip
+        clips: List of clips
+        needs_fix: Predicate selecting the clips fix_one must see
+        in_place: Predicate selecting clips that must be fixed on the calling thread
+        max_workers: Upper bound on worker threads
+        min_parallel: Fewest threadable clips worth starting a pool for
+        
+    Returns:
+        List of fixed clips in the original order
+    """
+    fixed = list(clips)
+    pending = [i for i, clip in enumerate(clips) if needs_fix(clip)]
+    threaded = [i for i in pending if not (in_place and in_place(clips[i]))]
+    if len(threaded) < min_parallel:
+        threaded = []
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(threaded))) as pool:
+            results = list(pool.map(fix_one, threaded, [clips[i] for i in threaded]))
+        for i, clip in zip(threaded, results):
+            fixed[i] = clip
+    for i in pending:
+        if i not in threaded:
+            fixed[i] = fix_one(i, clips[i])
+    return fixed
 
 def fix_composite_audio_clips(clips):
     """
@@ -207,51 +775,111 @@ def fix_composite_audio_clips(clips):
     Returns:
         List of fixed audio clips
     """
-    fixed_clips = []
-    
-    for i, clip in enumerate(clips):
+    def _fix_one(i, clip):
         try:
             fixed_clip = fix_audio_clip_duration(clip)
             
-            if not hasattr(fixed_clip, 'start') or fixed_clip.start is None or str(fixed_clip.start).startswith('_NoValueType'):
-                logger.info(f"🔄 Setting start time for clip {i+1} to 0")
-                fixed_clip = fixed_clip.set_start(0)
+            if not _has_valid_timing(fixed_clip):
+                if not hasattr(fixed_clip, 'start') or _is_unset(fixed_clip.start):
+                    logger.debug("🔄 Setting start time for clip %d to 0", i + 1)
+                    fixed_clip = fixed_clip.set_start(0)
             
-            if hasattr(fixed_clip, 'duration') and fixed_clip.duration is not None:
-                try:
-                    duration = float(fixed_clip.duration)
-                    if duration <= 0:
+                if hasattr(fixed_clip, 'duration') and fixed_clip.duration is not None:
+                    try:
+                        duration = float(fixed_clip.duration)
+                        if duration <= 0:
+                            logger.warning(f"⚠️ Invalid duration for clip {i+1}, using fallback duration 30.0")
+                            fixed_clip = fixed_clip.set_duration(30.0)
+                    except (TypeError, ValueError):
                         logger.warning(f"⚠️ Invalid duration for clip {i+1}, using fallback duration 30.0")
                         fixed_clip = fixed_clip.set_duration(30.0)
-                except (TypeError, ValueError):
-                    logger.warning(f"⚠️ Invalid duration for clip {i+1}, using fallback duration 30.0")
+                else:
+                    logger.warning(f"⚠️ Missing duration for clip {i+1}, using fallback duration 30.0")
                     fixed_clip = fixed_clip.set_duration(30.0)
-            else:
-                logger.warning(f"⚠️ Missing duration for clip {i+1}, using fallback duration 30.0")
-                fixed_clip = fixed_clip.set_duration(30.0)
             
-            try:
-                end_time = float(fixed_clip.start) + float(fixed_clip.duration)
-                fixed_clip = fixed_clip.set_end(end_time)
-            except (TypeError, ValueError):
-                logger.warning(f"⚠️ Invalid end time for clip {i+1}, setting based on duration")
-                fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + 30.0)
+                try:
+                    end_time = float(fixed_clip.start) + float(fixed_clip.duration)
+                    fixed_clip = fixed_clip.set_end(end_time)
+                except (TypeError, ValueError):
+                    logger.warning(f"⚠️ Invalid end time for clip {i+1}, setting based on duration")
+                    fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + 30.0)
             
             if isinstance(fixed_clip, CompositeAudioClip) and hasattr(fixed_clip, 'clips'):
-                logger.debug(f"🔄 Fixing {len(fixed_clip.clips)} sub-clips for clip {i+1}")
+                logger.debug("🔄 Fixing %d sub-clips for clip %d", len(fixed_clip.clips), i + 1)
                 fixed_clip.clips = fix_composite_audio_clips(fixed_clip.clips)
             
             debug_audio_clip(fixed_clip, f"Composite Clip {i+1}")
             
-            fixed_clips.append(fixed_clip)
-            logger.info(f"✅ Fixed audio clip {i+1}/{len(clips)}")
+            logger.debug("✅ Fixed audio clip %d/%d", i + 1, len(clips))
+            return fixed_clip
             
         except Exception as e:
             logger.error(f"❌ Error fixing audio clip {i+1}: {e}")
-            silent_clip = AudioClip(make_frame=lambda t: np.array([0.0]), duration=30.0)
-            fixed_clips.append(silent_clip)
+            return make_silent_clip(30.0)
+    
+    def _is_composite(clip):
+        return isinstance(clip, CompositeAudioClip)
+    
+    return _map_clips(_fix_one, clips,
+                      needs_fix=lambda clip: _is_composite(clip) or not _has_valid_timing(clip),
+                      in_place=_is_composite)
+
+def _is_no_value(value):
+    """Whether value is MoviePy's _NoValueType placeholder (type check, no str() of the value)."""
+    return type(value).__name__ == '_NoValueType'
+
+def _is_unset(value):
+    """Whether a clip attribute is None or MoviePy's _NoValueType placeholder."""
+    return value is None or _is_no_value(value)
+
+def _has_valid_timing(clip, min_duration=0.0):
+    """
+    Check whether a clip already has numeric, consistent duration/start/end.
     
-    return fixed_clips
+    Args:
+        clip: MoviePy clip
+        min_duration: Smallest acceptable duration
+        
+    Returns:
+        bool: True if no set_duration/set_start/set_end calls are needed
+    """
+    duration = getattr(clip, 'duration', None)
+    start = getattr(clip, 'start', None)
+    end = getattr(clip, 'end', None)
+    return (isinstance(duration, (int, float)) and duration > 0 and duration >= min_duration
+            and isinstance(start, (int, float)) and isinstance(end, (int, float))
+            and abs(end - (start + duration)) < 1e-6)
+
+def _render_textclip(text, font, fontsize, color, size, stroke_color, stroke_width):
+    """
+    Render a caption TextClip once per distinct set of rendering parameters.
+    
+    Callers must derive new clips with set_* (which copy) rather than mutate the result.
+    Colors and size given as lists are turned into tuples so they can key the cache.
+    
+    Returns:
+        TextClip template
+    """
+    def _hashable(value):
+        return tuple(value) if isinstance(value, list) else value
+    return _render_textclip_cached(text, font, fontsize, _hashable(color), _hashable(size),
+                                   _hashable(stroke_color), stroke_width)
+
+# Each 1080x1920 template pins its RGB frame and mask (~14 MB), so keep only a few
+@functools.lru_cache(maxsize=16)
+def _render_textclip_cached(text, font, fontsize, color, size, stroke_color, stroke_width):
+    """Build the TextClip template behind _render_textclip's cache."""
+    return TextClip(
+        text,
+        font=font,
+        fontsize=fontsize,
+        color=color,
+        stroke_color=stroke_color,
+        stroke_width=stroke_width,
+        size=size,
+        method='caption',
+        align='center'
+    )
 
 def validate_clip_properties(clip, clip_name="Unknown"):
     """
@@ -265,52 +893,56 @@ def validate_clip_properties(clip, clip_name="Unknown"):
         Clip with validated properties
     """
     try:
-        logger.debug(f"🔍 Validating clip: {clip_name} (type: {type(clip).__name__})")
+        logger.debug("🔍 Validating clip: %s (type: %s)", clip_name, type(clip).__name__)
         
         if clip is None:
             logger.warning(f"⚠️ Clip {clip_name} is None, creating fallback black clip")
             return ColorClip(size=(1080, 1920), color=(0, 0, 0), duration=0.5)
         
-        # Fix duration
-        duration = getattr(clip, 'duration', None)
-        if duration is None or str(duration).startswith('_NoValueType') or (isinstance(duration, (int, float)) and duration <= 0.5):
-            logger.warning(f"⚠️ Invalid or short duration for {clip_name}, setting to 0.5")
-            clip = clip.set_duration(0.5)
-        else:
-            try:
-                duration = float(duration)
-                clip = clip.set_duration(max(duration, 0.5))
-            except (TypeError, ValueError) as e:
-                logger.warning(f"⚠️ Cannot convert duration for {clip_name}: {e}, setting to 0.5")
+        # Fix duration, start and end (skipped when already consistent, each set_* copies the clip)
+        if not _has_valid_timing(clip, min_duration=0.5):
+            duration = getattr(clip, 'duration', None)
+            if _is_unset(duration) or (isinstance(duration, (int, float)) and duration <= 0.5):
+                logger.warning(f"⚠️ Invalid or short duration for {clip_name}, setting to 0.5")
                 clip = clip.set_duration(0.5)
+            else:
+                try:
+                    duration = float(duration)
+                    if not isinstance(clip.duration, (int, float)):
+                        clip = clip.set_duration(max(duration, 0.5))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"⚠️ Cannot convert duration for {clip_name}: {e}, setting to 0.5")
+                    clip = clip.set_duration(0.5)
         
-        # Fix start time
-        start = getattr(clip, 'start', None)
-        if start is None or str(start).startswith('_NoValueType'):
-            logger.debug(f"🔄 Setting start time for {clip_name} to 0")
-            clip = clip.set_start(0)
+            # Fix start time
+            start = getattr(clip, 'start', None)
+            if _is_unset(start):
+                logger.debug("🔄 Setting start time for %s to 0", clip_name)
+                clip = clip.set_start(0)
         
-        # Fix end time
-        try:
-            clip = clip.set_end(float(clip.start) + float(clip.duration))
-        except (TypeError, ValueError) as e:
-            logger.warning(f"⚠️ Invalid end time for {clip_name}: {e}, setting based on duration")
-            clip = clip.set_end(float(clip.start) + float(clip.duration))
+            # Fix end time
+            try:
+                expected_end = float(clip.start) + float(clip.duration)
+                if getattr(clip, 'end', None) != expected_end:
+                    clip = clip.set_end(expected_end)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Invalid end time for {clip_name}: {e}, setting based on duration")
+                clip = clip.set_end(float(clip.start) + float(clip.duration))
         
         # Fix size
-        if isinstance(clip, (ImageClip, CompositeVideoClip, TextClip)) and (not hasattr(clip, 'size') or clip.size is None or str(clip.size).startswith('_NoValueType')):
-            logger.debug(f"🔄 Setting size for {clip_name} to (1080, 1920)")
+        if isinstance(clip, (ImageClip, CompositeVideoClip, TextClip)) and (not hasattr(clip, 'size') or _is_unset(clip.size)):
+            logger.debug("🔄 Setting size for %s to (1080, 1920)", clip_name)
             clip = clip.resize((1080, 1920))
         
         # Fix position (including lambda functions)
         pos = getattr(clip, 'pos', None)
-        if pos is None or str(pos).startswith('_NoValueType'):
-            logger.debug(f"🔄 Setting position for {clip_name} to ('center', 'center')")
+        if _is_unset(pos):
+            logger.debug("🔄 Setting position for %s to ('center', 'center')", clip_name)
             clip = clip.set_position(('center', 'center'))
         elif callable(pos):
             try:
                 test_pos = pos(0)  # Test the position function
-                if str(test_pos).startswith('_NoValueType'):
+                if _is_no_value(test_pos):
                     logger.warning(f"⚠️ Position function for {clip_name} returns _NoValueType, resetting to ('center', 'center')")
                     clip = clip.set_position(('center', 'center'))
             except Exception as e:
@@ -319,12 +951,12 @@ def validate_clip_properties(clip, clip_name="Unknown"):
         
         # Fix FPS
         fps = getattr(clip, 'fps', None)
-        if fps is None or str(fps).startswith('_NoValueType') or (isinstance(fps, (int, float)) and fps <= 0):
-            logger.debug(f"🔄 Setting FPS for {clip_name} to 30")
+        if _is_unset(fps) or (isinstance(fps, (int, float)) and fps <= 0):
+            logger.debug("🔄 Setting FPS for %s to 30", clip_name)
             clip = clip.set_fps(30)
         
         # Fix mask for TextClip
-        if isinstance(clip, TextClip) and hasattr(clip, 'mask') and (clip.mask is None or str(clip.mask).startswith('_NoValueType')):
+        if isinstance(clip, TextClip) and hasattr(clip, 'mask') and _is_unset(clip.mask):
             logger.warning(f"⚠️ Invalid mask for {clip_name}, removing mask")
             clip.mask = None
         
@@ -337,56 +969,51 @@ def validate_clip_properties(clip, clip_name="Unknown"):
             stroke_width = getattr(clip, 'stroke_width', 1)
             
             invalid_attrs = []
-            if text is None or str(text).startswith('_NoValueType'):
+            if _is_unset(text):
                 invalid_attrs.append(f"text={text}")
                 text = "Fallback"
-            if font is None or str(font).startswith('_NoValueType'):
+            if _is_unset(font):
                 invalid_attrs.append(f"font={font}")
                 font = 'FreeSerif'
-            if fontsize is None or str(fontsize).startswith('_NoValueType') or (isinstance(fontsize, (int, float)) and fontsize <= 0):
+            if _is_unset(fontsize) or (isinstance(fontsize, (int, float)) and fontsize <= 0):
                 invalid_attrs.append(f"fontsize={fontsize}")
                 fontsize = 40
-            if color is None or str(color).startswith('_NoValueType'):
+            if _is_unset(color):
                 invalid_attrs.append(f"color={color}")
                 color = 'white'
-            if stroke_width is None or str(stroke_width).startswith('_NoValueType') or (isinstance(stroke_width, (int, float)) and stroke_width < 0):
+            if _is_unset(stroke_width) or (isinstance(stroke_width, (int, float)) and stroke_width < 0):
                 invalid_attrs.append(f"stroke_width={stroke_width}")
                 stroke_width = 1
             
             if invalid_attrs:
                 logger.warning(f"⚠️ Invalid attributes for {clip_name}: {', '.join(invalid_attrs)}, recreating TextClip")
                 try:
-                    clip = TextClip(
-                        text,
-                        font=font,
-                        fontsize=int(fontsize),
-                        color=color,
-                        stroke_color='black',
-                        stroke_width=float(stroke_width),
-                        size=(1080, 1920),
-                        method='caption',
-                        align='center'
-                    )
-                    clip = clip.set_duration(max(float(clip.duration), 0.5)).set_position(('center', 'bottom')).set_fps(30)
+                    duration = clip.duration
+                    clip = _render_textclip(str(text), font, int(fontsize), color, (1080, 1920), 'black', float(stroke_width))
+                    clip = clip.set_duration(max(float(duration), 0.5)).set_position(('center', 'bottom')).set_fps(30)
                     logger.info(f"✅ Recreated TextClip for {clip_name}")
                 except Exception as e:
                     logger.error(f"❌ Failed to recreate TextClip for {clip_name}: {e}")
                     clip = ColorClip(size=(1080, 1920), color=(0, 0, 0), duration=0.5)
             else:
-                logger.debug(f"✅ TextClip {clip_name} has valid attributes: text={text}, font={font}, fontsize={fontsize}, color={color}, stroke_width={stroke_width}")
+                logger.debug("✅ TextClip %s has valid attributes: text=%s, font=%s, fontsize=%s, color=%s, stroke_width=%s",
+                             clip_name, text, font, fontsize, color, stroke_width)
         
         # Recursively validate sub-clips
         if isinstance(clip, CompositeVideoClip) and hasattr(clip, 'clips'):
-            logger.debug(f"🔄 Validating {len(clip.clips)} sub-clips for {clip_name}")
+            logger.debug("🔄 Validating %d sub-clips for %s", len(clip.clips), clip_name)
             clip.clips = [validate_clip_properties(subclip, f"Sub-clip {i+1} of {clip_name}") for i, subclip in enumerate(clip.clips)]
         
         # Log validated properties
-        logger.debug(f"✅ Validated {clip_name}: duration={getattr(clip, 'duration', 'NOT SET')}, "
-                    f"start={getattr(clip, 'start', 'NOT SET')}, "
-                    f"end={getattr(clip, 'end', 'NOT SET')}, "
-                    f"size={getattr(clip, 'size', 'NOT SET')}, "
-                    f"fps={getattr(clip, 'fps', 'NOT SET')}, "
-                    f"pos={getattr(clip, 'pos', 'NOT SET')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ Validated %s: duration=%s, start=%s, end=%s, size=%s, fps=%s, pos=%s",
+                         clip_name,
+                         getattr(clip, 'duration', 'NOT SET'),
+                         getattr(clip, 'start', 'NOT SET'),
+                         getattr(clip, 'end', 'NOT SET'),
+                         getattr(clip, 'size', 'NOT SET'),
+                         getattr(clip, 'fps', 'NOT SET'),
+                         getattr(clip, 'pos', 'NOT SET'))
         
         return clip
     except Exception as e:
@@ -404,46 +1031,45 @@ def fix_composite_video_clips(clips, fallback_duration=0.5):
     Returns:
         List of fixed video clips
     """
-    fixed_clips = []
-    
-    for i, clip in enumerate(clips):
+    def _fix_one(i, clip):
         try:
             fixed_clip = validate_clip_properties(clip, f"Clip {i+1}")
             
-            if hasattr(fixed_clip, 'duration') and fixed_clip.duration is not None:
-                try:
-                    duration = float(fixed_clip.duration)
-                    if duration <= 0.5:
-                        logger.warning(f"⚠️ Video clip {i+1} has short duration, using minimum 0.5s")
-                        fixed_clip = fixed_clip.set_duration(0.5)
-                except (TypeError, ValueError) as e:
-                    logger.warning(f"⚠️ Invalid duration for clip {i+1}: {e}, using fallback duration")
+            if not _has_valid_timing(fixed_clip, min_duration=0.5):
+                if hasattr(fixed_clip, 'duration') and fixed_clip.duration is not None:
+                    try:
+                        duration = float(fixed_clip.duration)
+                        if duration <= 0.5:
+                            logger.warning(f"⚠️ Video clip {i+1} has short duration, using minimum 0.5s")
+                            fixed_clip = fixed_clip.set_duration(0.5)
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"⚠️ Invalid duration for clip {i+1}: {e}, using fallback duration")
+                        fixed_clip = fixed_clip.set_duration(fallback_duration)
+                else:
+                    logger.warning(f"⚠️ Video clip {i+1} missing duration, using fallback duration")
                     fixed_clip = fixed_clip.set_duration(fallback_duration)
-            else:
-                logger.warning(f"⚠️ Video clip {i+1} missing duration, using fallback duration")
-                fixed_clip = fixed_clip.set_duration(fallback_duration)
             
-            if not hasattr(fixed_clip, 'start') or fixed_clip.start is None or str(fixed_clip.start).startswith('_NoValueType'):
-                logger.debug(f"🔄 Setting start time for clip {i+1} to 0")
-                fixed_clip = fixed_clip.set_start(0)
+                if not hasattr(fixed_clip, 'start') or _is_unset(fixed_clip.start):
+                    logger.debug("🔄 Setting start time for clip %d to 0", i + 1)
+                    fixed_clip = fixed_clip.set_start(0)
             
-            try:
-                fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + float(fixed_clip.duration))
-            except (TypeError, ValueError) as e:
-                logger.warning(f"⚠️ Invalid end time for clip {i+1}: {e}, setting based on fallback duration")
-                fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + fallback_duration)
+                try:
+                    fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + float(fixed_clip.duration))
+                except (TypeError, ValueError) as e:
+                    logger.warning(f"⚠️ Invalid end time for clip {i+1}: {e}, setting based on fallback duration")
+                    fixed_clip = fixed_clip.set_end(float(fixed_clip.start) + fallback_duration)
             
-            if isinstance(fixed_clip, (ImageClip, CompositeVideoClip, TextClip)) and (not hasattr(fixed_clip, 'size') or fixed_clip.size is None or str(fixed_clip.size).startswith('_NoValueType')):
-                logger.debug(f"🔄 Setting size for clip {i+1} to (1080, 1920)")
+            if isinstance(fixed_clip, (ImageClip, CompositeVideoClip, TextClip)) and (not hasattr(fixed_clip, 'size') or _is_unset(fixed_clip.size)):
+                logger.debug("🔄 Setting size for clip %d to (1080, 1920)", i + 1)
                 fixed_clip = fixed_clip.resize((1080, 1920))
             
-            if isinstance(fixed_clip, (ImageClip, TextClip)) and (not hasattr(fixed_clip, 'pos') or fixed_clip.pos is None or str(fixed_clip.pos).startswith('_NoValueType')):
-                logger.debug(f"🔄 Setting position for clip {i+1} to ('center', 'center')")
+            if isinstance(fixed_clip, (ImageClip, TextClip)) and (not hasattr(fixed_clip, 'pos') or _is_unset(fixed_clip.pos)):
+                logger.debug("🔄 Setting position for clip %d to ('center', 'center')", i + 1)
                 fixed_clip = fixed_clip.set_position(('center', 'center'))
             elif isinstance(fixed_clip, (ImageClip, TextClip)) and callable(fixed_clip.pos):
                 try:
                     test_pos = fixed_clip.pos(0)
-                    if str(test_pos).startswith('_NoValueType'):
+                    if _is_no_value(test_pos):
                         logger.warning(f"⚠️ Position function for clip {i+1} returns _NoValueType, resetting")
                         fixed_clip = fixed_clip.set_position(('center', 'center'))
                 except Exception as e:
@@ -451,31 +1077,163 @@ def fix_composite_video_clips(clips, fallback_duration=0.5):
                     fixed_clip = fixed_clip.set_position(('center', 'center'))
             
             # Fix mask for TextClip
-            if isinstance(fixed_clip, TextClip) and hasattr(fixed_clip, 'mask') and (fixed_clip.mask is None or str(fixed_clip.mask).startswith('_NoValueType')):
+            if isinstance(fixed_clip, TextClip) and hasattr(fixed_clip, 'mask') and _is_unset(fixed_clip.mask):
                 logger.warning(f"⚠️ Invalid mask for clip {i+1}, removing mask")
                 fixed_clip.mask = None
             
-            logger.debug(f"🔍 Video clip {i+1} properties: duration={getattr(fixed_clip, 'duration', 'NOT SET')}, "
-                        f"start={getattr(fixed_clip, 'start', 'NOT SET')}, "
-                        f"end={getattr(fixed_clip, 'end', 'NOT SET')}, "
-                        f"size={getattr(fixed_clip, 'size', 'NOT SET')}, "
-                        f"fps={getattr(fixed_clip, 'fps', 'NOT SET')}, "
-                        f"pos={getattr(fixed_clip, 'pos', 'NOT SET')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 Video clip %d properties: duration=%s, start=%s, end=%s, size=%s, fps=%s, pos=%s",
+                             i + 1,
+                             getattr(fixed_clip, 'duration', 'NOT SET'),
+                             getattr(fixed_clip, 'start', 'NOT SET'),
+                             getattr(fixed_clip, 'end', 'NOT SET'),
+                             getattr(fixed_clip, 'size', 'NOT SET'),
+                             getattr(fixed_clip, 'fps', 'NOT SET'),
+                             getattr(fixed_clip, 'pos', 'NOT SET'))
             
-            fixed_clips.append(fixed_clip)
-            logger.info(f"✅ Fixed video clip {i+1}/{len(clips)}")
+            logger.debug("✅ Fixed video clip %d/%d", i + 1, len(clips))
+            return fixed_clip
             
         except Exception as e:
             logger.error(f"❌ Error fixing video clip {i+1}: {e}", exc_info=True)
-            black_clip = ColorClip(size=(1080, 1920), color=(0, 0, 0), duration=fallback_duration)
-            fixed_clips.append(black_clip)
+            return ColorClip(size=(1080, 1920), color=(0, 0, 0), duration=fallback_duration)
+    
+    return _map_clips(_fix_one, clips, needs_fix=_video_clip_needs_fix,
+                      in_place=lambda clip: isinstance(clip, (CompositeVideoClip, TextClip)))
+
+def _video_clip_needs_fix(clip):
+    """Cheap pre-check: whether any fix in validate_clip_properties/fix_composite_video_clips could apply."""
+    if clip is None or isinstance(clip, (CompositeVideoClip, TextClip)):
+        return True
+    if not _has_valid_timing(clip, min_duration=0.5):
+        return True
+    if isinstance(clip, ImageClip) and _is_unset(getattr(clip, 'size', None)):
+        return True
+    fps = getattr(clip, 'fps', None)
+    if _is_unset(fps) or (isinstance(fps, (int, float)) and fps <= 0):
+        return True
+    pos = getattr(clip, 'pos', None)
+    if _is_unset(pos):
+        return True
+    if callable(pos):
+        try:
+            return _is_no_value(pos(0))
+        except Exception:
+            return True
+    return False
+
+# Clip shared with forked render workers (lambdas in clips cannot be pickled)
+_PARALLEL_CLIP = None
+
+def _reopen_readers(clip, seen=None):
+    """
+    Give a forked worker its own ffmpeg decoders for every file-backed clip in the graph.
+    
+    The inherited readers point at the parent's ffmpeg pipes; reading them from
+    several processes interleaves frames. The handles are dropped rather than
+    closed, since closing would terminate the parent's ffmpeg process.
+    
+    Args:
+        clip: MoviePy clip (video, audio or composite)
+        seen: ids already visited (internal)
+    """
+    seen = set() if seen is None else seen
+    if clip is None or id(clip) in seen:
+        return
+    seen.add(id(clip))
+    
+    reader = getattr(clip, 'reader', None)
+    if reader is not None and hasattr(reader, 'initialize'):
+        reader.proc = None
+        reader.initialize()
+    
+    for child in getattr(clip, 'clips', None) or []:
+        _reopen_readers(child, seen)
+    _reopen_readers(getattr(clip, 'audio', None), seen)
+    _reopen_readers(getattr(clip, 'mask', None), seen)
+
+def _render_chunk(args):
+    """
+    Render one time range of the shared clip to its own file (runs in a forked worker).
+    
+    Args:
+        args: Tuple of (start, end, part_path, write_videofile params)
+        
+    Returns:
+        str: Path to the rendered part
+    """
+    start, end, part_path, params = args
+    _reopen_readers(_PARALLEL_CLIP)
+    params = dict(params, temp_audiofile=f"{part_path}.m4a")
+    _PARALLEL_CLIP.subclip(start, end).write_videofile(part_path, **params)
+    return part_path
+
+def parallel_write_videofile(video_clip, output_path, workers, **params):
+    """
+    Render a clip as N time chunks in parallel processes and join them with ffmpeg's concat demuxer.
+    
+    Args:
+        video_clip: MoviePy VideoClip
+        output_path: Output file path
+        workers: Number of render processes / chunks
+        **params: Arguments for write_videofile
+    """
+    global _PARALLEL_CLIP
+    
+    # Cut on frame boundaries so no frame is duplicated or dropped at the joins
+    fps = params.get('fps') or video_clip.fps or 30
+    bounds = np.round(np.linspace(0, float(video_clip.duration), workers + 1) * fps) / fps
+    bounds[-1] = float(video_clip.duration)
+    
+    # Split the CPU between workers, and encode in software: N concurrent nvenc/qsv
+    # sessions exceed the per-GPU session cap on consumer cards
+    params = dict(params, threads=max(1, (os.cpu_count() or 1) // workers))
+    if params.get('codec') in HW_ENCODERS:
+        params.pop('preset', None)
+        params.update(get_encoder_params('libx264', params.get('bitrate')), threads=params['threads'])
     
-    return fixed_clips
+    with tempfile.TemporaryDirectory(prefix="render-") as tmp_dir:
+        jobs = [(bounds[i], bounds[i + 1], os.path.join(tmp_dir, f"part_{i}.mp4"), params)
+                for i in range(workers)]
+        
+        # A forked child inherits locks held by other threads in their current state;
+        # let the TTS warmup (which holds the import and model locks) finish first
+        if _TTS_WARMUP_THREAD is not None and _TTS_WARMUP_THREAD.is_alive():
+            logger.info("⏳ Waiting for TTS warmup to finish before forking render workers")
+            _TTS_WARMUP_THREAD.join()
+        _PARALLEL_CLIP = video_clip
+        try:
+            with multiprocessing.get_context('fork').Pool(workers) as pool:
+                parts = pool.map(_render_chunk, jobs)
+        finally:
+            _PARALLEL_CLIP = None
+        
+        list_file = os.path.join(tmp_dir, "parts.txt")
+        with open(list_file, 'w', encoding='utf-8') as f:
+            f.writelines(f"file '{part}'\n" for part in parts)
+        
+        subprocess.run(
+            [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+             '-i', list_file, '-c', 'copy', '-movflags', '+faststart', output_path],
+            check=True
+        )
+    logger.info(f"✅ Joined {workers} parallel render chunks into {output_path}")
+
+def _is_nonempty_file(path) -> bool:
+    """Whether path exists and has content, using a single stat call."""
+    try:
+        return os.stat(path).st_size > 0
+    except OSError:
+        return False
 
 def safe_write_videofile(video_clip, output_path, **kwargs):
     """
     Safely write video file with proper audio and video clip handling.
     
+    The caller owns video_clip and must close it (its readers are shared by every copy made
+    here); only clips this function builds itself, such as looped audio, are released before
+    returning.
+    
     Args:
         video_clip: MoviePy VideoClip
         output_path: Output file path
@@ -484,6 +1242,7 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
     Returns:
         bool: Success status
     """
+    looped_audio = None  # Built here, so released here
     try:
         if video_clip is None:
             logger.error("❌ Video clip is None")
@@ -492,11 +1251,11 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
         logger.info("🔄 Fixing and validating main video clip properties...")
         video_clip = validate_clip_properties(video_clip, "Main Video Clip")
         
-        if not hasattr(video_clip, 'duration') or video_clip.duration is None or str(video_clip.duration).startswith('_NoValueType'):
+        if not hasattr(video_clip, 'duration') or _is_unset(video_clip.duration):
             logger.error("❌ Invalid video clip duration")
             return False
         
-        if not hasattr(video_clip, 'size') or video_clip.size is None or str(video_clip.size).startswith('_NoValueType'):
+        if not hasattr(video_clip, 'size') or _is_unset(video_clip.size):
             logger.debug("🔄 Setting video clip size to (1080, 1920)")
             video_clip = video_clip.resize((1080, 1920))
         
@@ -505,26 +1264,31 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
             video_clip.clips = fix_composite_video_clips(video_clip.clips)
         
         # Debug all clip properties before writing
-        logger.debug("🔍 Debugging final clip properties before writing...")
-        logger.debug(f"Main clip: duration={getattr(video_clip, 'duration', 'NOT SET')}, "
-                    f"start={getattr(video_clip, 'start', 'NOT SET')}, "
-                    f"size={getattr(video_clip, 'size', 'NOT SET')}, "
-                    f"fps={getattr(video_clip, 'fps', 'NOT SET')}, "
-                    f"pos={getattr(video_clip, 'pos', 'NOT SET')}")
-        if isinstance(video_clip, CompositeVideoClip):
-            for i, subclip in enumerate(video_clip.clips):
-                logger.debug(f"Sub-clip {i+1}: type={type(subclip).__name__}, "
-                            f"duration={getattr(subclip, 'duration', 'NOT SET')}, "
-                            f"start={getattr(subclip, 'start', 'NOT SET')}, "
-                            f"size={getattr(subclip, 'size', 'NOT SET')}, "
-                            f"fps={getattr(subclip, 'fps', 'NOT SET')}, "
-                            f"pos={getattr(subclip, 'pos', 'NOT SET')}")
-                if isinstance(subclip, TextClip):
-                    logger.debug(f"TextClip {i+1}: text={getattr(subclip, 'text', 'NOT SET')}, "
-                                f"font={getattr(subclip, 'font', 'NOT SET')}, "
-                                f"fontsize={getattr(subclip, 'fontsize', 'NOT SET')}, "
-                                f"color={getattr(subclip, 'color', 'NOT SET')}, "
-                                f"mask={getattr(subclip, 'mask', 'NOT SET')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Debugging final clip properties before writing...")
+            logger.debug("Main clip: duration=%s, start=%s, size=%s, fps=%s, pos=%s",
+                         getattr(video_clip, 'duration', 'NOT SET'),
+                         getattr(video_clip, 'start', 'NOT SET'),
+                         getattr(video_clip, 'size', 'NOT SET'),
+                         getattr(video_clip, 'fps', 'NOT SET'),
+                         getattr(video_clip, 'pos', 'NOT SET'))
+            if isinstance(video_clip, CompositeVideoClip):
+                for i, subclip in enumerate(video_clip.clips):
+                    logger.debug("Sub-clip %d: type=%s, duration=%s, start=%s, size=%s, fps=%s, pos=%s",
+                                 i + 1, type(subclip).__name__,
+                                 getattr(subclip, 'duration', 'NOT SET'),
+                                 getattr(subclip, 'start', 'NOT SET'),
+                                 getattr(subclip, 'size', 'NOT SET'),
+                                 getattr(subclip, 'fps', 'NOT SET'),
+                                 getattr(subclip, 'pos', 'NOT SET'))
+                    if isinstance(subclip, TextClip):
+                        logger.debug("TextClip %d: text=%s, font=%s, fontsize=%s, color=%s, mask=%s",
+                                     i + 1,
+                                     getattr(subclip, 'text', 'NOT SET'),
+                                     getattr(subclip, 'font', 'NOT SET'),
+                                     getattr(subclip, 'fontsize', 'NOT SET'),
+                                     getattr(subclip, 'color', 'NOT SET'),
+                                     getattr(subclip, 'mask', 'NOT SET'))
         
         if video_clip.audio is not None:
             logger.info("🔊 Video has audio, fixing audio issues...")
@@ -540,32 +1304,42 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
                     fixed_audio = fixed_audio.subclip(0, video_clip.duration)
                     logger.info(f"✂️ Trimmed audio to match video duration")
                 else:
-                    loops_needed = int(np.ceil(video_clip.duration / fixed_audio.duration))
-                    fixed_audio = concatenate_audioclips([fixed_audio] * loops_needed)
-                    fixed_audio = fixed_audio.subclip(0, video_clip.duration)
+                    fixed_audio = looped_audio = loop_audio_clip(fixed_audio, video_clip.duration)
                     logger.info(f"🔄 Looped audio to match video duration")
             
             video_clip = video_clip.set_audio(fixed_audio)
         
         default_params = {
             'fps': 30,
-            'codec': 'libx264',
             'audio_codec': 'aac',
-            'temp_audiofile': 'temp-audio.m4a',
+            'temp_audiofile': f"{output_path}.temp-audio.m4a",
             'remove_temp': True,
             'verbose': True,  # Enable verbose logging for debugging
             'logger': None
         }
+        default_params.update(get_encoder_params(kwargs.get('codec'), kwargs.get('bitrate')))
         
         default_params.update(kwargs)
         
+        # Opt-in chunked parallel render (chunk joins can shift AAC audio by a few ms)
+        render_workers = int(os.getenv('SHORTS_RENDER_WORKERS', '1'))
+        if render_workers > 1 and hasattr(os, 'fork'):
+            try:
+                logger.info(f"💾 Writing video to: {output_path} with {render_workers} parallel workers")
+                parallel_write_videofile(video_clip, output_path, render_workers, **default_params)
+                if _is_nonempty_file(output_path):
+                    logger.info(f"✅ Video successfully written: {output_path}")
+                    return True
+            except Exception as e:
+                logger.warning(f"⚠️ Parallel render failed, falling back to single writer: {e}")
+        
         max_retries = 2
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"💾 Writing video to: {output_path} (Attempt {attempt}/{max_retries})")
                 video_clip.write_videofile(output_path, **default_params)
                 
-                if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+                if _is_nonempty_file(output_path):
                     logger.info(f"✅ Video successfully written: {output_path}")
                     return True
                 else:
@@ -574,6 +1348,11 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
                 
             except Exception as e:
                 logger.error(f"❌ Error writing video file (Attempt {attempt}/{max_retries}): {str(e)}")
+                if default_params.get('codec') in HW_ENCODERS:
+                    logger.warning(f"🔄 Falling back from {default_params['codec']} to libx264")
+                    software_params = get_encoder_params('libx264', default_params.get('bitrate'))
+                    default_params.pop('preset', None)
+                    default_params.update(software_params)
                 if attempt < max_retries:
                     logger.info(f"🔄 Retrying after 1.0s...")
                     time.sleep(1.0)
@@ -586,11 +1365,52 @@ def safe_write_videofile(video_clip, output_path, **kwargs):
         return False
     
     finally:
+        # Synchronous, and limited to what this function created: subclip/resize/set_audio
+        # copies share the caller's readers, so closing them would close the caller's clip
+        _close_clip_safely(looped_audio, f"{output_path}.temp-audio.m4a")
+
+def _close_clip_safely(clip, temp_audiofile=None):
+    """
+    Close a clip, stop its ffmpeg readers and remove its leftover temp audio file.
+    
+    Args:
+        clip: MoviePy clip (may be None)
+        temp_audiofile: Temporary audio file written for this clip, if any
+    """
+    try:
+        if hasattr(clip, 'close'):
+            clip.close()
+    except:
+        pass
+    release_clip_readers(clip)
+    if temp_audiofile and os.path.exists(temp_audiofile):
+        try:
+            os.remove(temp_audiofile)
+        except OSError as e:
+            logger.debug(f"Could not remove {temp_audiofile}: {e}")
+
+def release_clip_readers(clip):
+    """
+    Terminate any ffmpeg reader subprocesses still attached to a clip and its audio.
+    
+    Args:
+        clip: MoviePy clip (may be None)
+    """
+    reader = getattr(clip, 'reader', None)
+    if reader is not None:
         try:
-            if hasattr(video_clip, 'close'):
-                video_clip.close()
-        except:
+            reader.close()
+        except Exception:
             pass
+    audio_reader = getattr(getattr(clip, 'audio', None), 'reader', None)
+    if audio_reader is not None:
+        try:
+            audio_reader.close_proc()
+        except Exception:
+            pass
+
+# Opt-in get_frame(0) probe in debug_audio_clip
+AUDIO_FRAME_PROBE = os.getenv('AUDIO_FRAME_PROBE', 'false').lower() == 'true'
 
 def debug_audio_clip(audio_clip, clip_name="Unknown"):
     """
@@ -600,23 +1420,33 @@ def debug_audio_clip(audio_clip, clip_name="Unknown"):
         audio_clip: AudioClip to debug
         clip_name: Name for logging
     """
-    logger.debug(f"🔍 Debugging audio clip: {clip_name}")
+    # Constant-folded away under python -O; otherwise skipped unless DEBUG logging is on
+    if not __debug__ or not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    logger.debug("🔍 Debugging audio clip: %s", clip_name)
     
     try:
-        logger.debug(f"   - Duration: {getattr(audio_clip, 'duration', 'NOT SET')}")
-        logger.debug(f"   - Start: {getattr(audio_clip, 'start', 'NOT SET')}")
-        logger.debug(f"   - End: {getattr(audio_clip, 'end', 'NOT SET')}")
-        logger.debug(f"   - FPS: {getattr(audio_clip, 'fps', 'NOT SET')}")
+        logger.debug("   - Duration: %s", getattr(audio_clip, 'duration', 'NOT SET'))
+        logger.debug("   - Start: %s", getattr(audio_clip, 'start', 'NOT SET'))
+        logger.debug("   - End: %s", getattr(audio_clip, 'end', 'NOT SET'))
+        logger.debug("   - FPS: %s", getattr(audio_clip, 'fps', 'NOT SET'))
         
         if hasattr(audio_clip, 'clips'):
-            logger.debug(f"   - Composite with {len(audio_clip.clips)} clips")
+            logger.debug("   - Composite with %d clips", len(audio_clip.clips))
             for i, subclip in enumerate(audio_clip.clips):
-                logger.debug(f"     Clip {i+1}: duration={getattr(subclip, 'duration', 'NOT SET')}, "
-                            f"start={getattr(subclip, 'start', 'NOT SET')}")
+                logger.debug("     Clip %d: duration=%s, start=%s", i + 1,
+                             getattr(subclip, 'duration', 'NOT SET'),
+                             getattr(subclip, 'start', 'NOT SET'))
         
+        # Probe the first frame only on request and once per clip; it starts an ffmpeg decode
+        # for file clips, and main.py runs with the root logger at DEBUG in production
+        if not AUDIO_FRAME_PROBE or getattr(audio_clip, '_probed', False):
+            return
         try:
+            audio_clip._probed = True
             frame = audio_clip.get_frame(0)
-            logger.debug(f"   - Frame at t=0: shape={np.shape(frame)}")
+            logger.debug("   - Frame at t=0: shape=%s", np.shape(frame))
         except Exception as e:
             logger.error(f"   - Cannot get frame: {e}")
             
@@ -635,22 +1465,33 @@ def create_video_with_fixed_audio(video_path, audio_path, output_path):
     Returns:
         bool: Success status
     """
+    # Fast path: loop/trim the audio and mux it onto the untouched video stream in one ffmpeg pass
     try:
-        video_clip = VideoFileClip(video_path)
-        logger.info(f"📹 Loaded video: {video_clip.duration:.2f}s")
-        
-        audio_clip = create_safe_audio_clip(audio_path, target_duration=video_clip.duration)
-        
-        debug_audio_clip(audio_clip, "Generated Audio")
-        
-        final_video = video_clip.set_audio(audio_clip)
-        
-        success = safe_write_videofile(final_video, output_path)
-        
-        video_clip.close()
-        audio_clip.close()
-        
-        return success
+        duration = _cached_duration(video_path)
+        subprocess.run(
+            [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+             '-stream_loop', '-1', '-i', str(audio_path), '-i', str(video_path),
+             '-map', '1:v', '-map', '0:a', '-c:v', 'copy', '-c:a', 'aac',
+             '-t', f"{duration:.3f}", '-shortest', '-movflags', '+faststart', str(output_path)],
+            check=True, capture_output=True
+        )
+        if _is_nonempty_file(output_path):
+            logger.info(f"✅ Muxed audio onto video with ffmpeg: {output_path}")
+            return True
+    except Exception as e:
+        logger.warning(f"⚠️ ffmpeg mux failed, falling back to MoviePy: {e}")
+    
+    try:
+        # Context managers close the ffmpeg readers even when writing fails
+        with VideoFileClip(video_path) as video_clip:
+            logger.info(f"📹 Loaded video: {video_clip.duration:.2f}s")
+            
+            with create_safe_audio_clip(audio_path, target_duration=video_clip.duration) as audio_clip:
+                debug_audio_clip(audio_clip, "Generated Audio")
+                
+                final_video = video_clip.set_audio(audio_clip)
+                
+                return safe_write_videofile(final_video, output_path)
         
     except Exception as e:
         logger.error(f"❌ Error creating video with audio: {e}", exc_info=True)
@@ -661,7 +1502,7 @@ if __name__ == "__main__":
     
     print("🧪 Testing audio fix utilities...")
     
-    test_clip = AudioClip(make_frame=lambda t: np.array([0.0]), duration=30.0)
+    test_clip = make_silent_clip(30.0)
     debug_audio_clip(test_clip, "Test Silent Clip")
     
     print("✅ Audio fix utilities ready!")
\ No newline at end of file
@@ -1,41 +1,107 @@
 import os
 import pickle
 import json
+import gzip
 import logging
-from datetime import datetime
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
 
 logger = logging.getLogger(__name__)
 
+# googleapiclient and google-auth are imported inside the methods that use them, so importing this
+# module for generate_video_metadata alone does not pay for the Google client stack
+
+# YouTube snippet limits and the tags every Short carries
+TITLE_MAX_LENGTH = 100
+DESCRIPTION_MAX_LENGTH = 5000
+DEFAULT_TAGS = ('youtube shorts', 'short video')
+
+# Resumable upload chunk size (YT_UPLOAD_CHUNK_MB); each chunk costs one HTTP round trip, so larger
+# chunks finish sooner on high-latency links while memory stays capped at one chunk
+UPLOAD_CHUNK_SIZE = int(os.getenv('YT_UPLOAD_CHUNK_MB', '8')) * 1024 * 1024
+# Files up to this size are streamed in one resumable PUT instead of chunk by chunk
+SINGLE_REQUEST_MAX_SIZE = 64 * 1024 * 1024
+
+# Upper bound on a single backoff and on total wall time an upload may take once it holds a slot,
+# including googleapiclient's in-library chunk retries (YT_UPLOAD_DEADLINE)
+MAX_RETRY_DELAY = 60
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+UPLOAD_DEADLINE = int(os.getenv('YT_UPLOAD_DEADLINE', '900'))
+
+# Authenticated API clients shared across uploader instances, keyed by credential and token file state
+_CLIENT_CACHE = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+# YT_COMPRESS_METADATA=true writes sidecars gzipped as .metadata.json.gz
+COMPRESS_METADATA = os.getenv('YT_COMPRESS_METADATA', 'false').lower() == 'true'
+
+# Thumbnails and metadata sidecars are handled in the background so the caller can move on once the
+# video itself is up; worker threads are joined at interpreter exit, so pending work still completes
+_POST_UPLOAD_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="yt-post-upload")
+_THREAD_LOCAL = threading.local()
+
+# Concurrent video inserts allowed per process (YT_MAX_CONCURRENT_UPLOADS); further callers queue
+# rather than pushing the API into 429 rate limiting
+_UPLOAD_SLOTS = threading.BoundedSemaphore(int(os.getenv('YT_MAX_CONCURRENT_UPLOADS', '3')))
+
+def _write_upload_metadata(metadata_path: Path, payload: str):
+    """Write an upload's already-serialized metadata sidecar; runs on _POST_UPLOAD_POOL, so failures are logged rather than raised"""
+    try:
+        if COMPRESS_METADATA:
+            metadata_path = metadata_path.with_name(metadata_path.name + '.gz')
+            with gzip.open(metadata_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(payload)
+        else:
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+        logger.info("✅ Metadata saved to %s", metadata_path)
+    except Exception:
+        logger.exception(f"⚠️ Failed to save metadata to {metadata_path}")
+
+def _thread_http(credentials):
+    """Authorized transport for the calling thread; httplib2 connections must not be shared across threads"""
+    http = getattr(_THREAD_LOCAL, 'http', None)
+    if http is None or http.credentials is not credentials:
+        import google_auth_httplib2
+        from googleapiclient.http import build_http
+        http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+        _THREAD_LOCAL.http = http
+    return http
+
 def generate_video_metadata(topic: str, category: str, script: str = '') -> tuple:
     """Generate metadata for the YouTube video based on topic, category, and optional script"""
-    logger.info(f"📝 Generating video metadata for topic: {topic}, category: {category}")
+    logger.info("📝 Generating video metadata for topic: %s, category: %s", topic, category)
     try:
         title = f"{topic} | {category} Short"
-        if len(title) > 100:
-            title = title[:97] + "..."  # YouTube title limit is 100 characters
+        if len(title) > TITLE_MAX_LENGTH:
+            title = title[:TITLE_MAX_LENGTH - 3] + "..."
+        
+        topic_lower = topic.lower()
+        category_lower = category.lower()
+        topic_slug = topic_lower.replace(" ", "")
         
-        description = (
-            f"Discover {topic.lower()} in this quick {category} Short! "
-            f"Learn something new and exciting about {topic.lower()}. "
-            "Subscribe and hit the bell for more fascinating content! "
-            f"#{category.lower()} #youtubeshorts #{topic.replace(' ', '').lower()}"
-        )
         if script:
-            description = f"{script[:200]}... Subscribe for more! #{category.lower()} #youtubeshorts"
-        if len(description) > 5000:
-            description = description[:4997] + "..."  # YouTube description limit is 5000 characters
+            description = f"{script[:200]}... Subscribe for more! #{category_lower} #youtubeshorts"
+        else:
+            description = (
+                f"Discover {topic_lower} in this quick {category} Short! "
+                f"Learn something new and exciting about {topic_lower}. "
+                "Subscribe and hit the bell for more fascinating content! "
+                f"#{category_lower} #youtubeshorts #{topic_slug}"
+            )
+        if len(description) > DESCRIPTION_MAX_LENGTH:
+            description = description[:DESCRIPTION_MAX_LENGTH - 3] + "..."
         
         tags = [
-            "youtube shorts",
-            category.lower(),
-            topic.lower().replace(" ", ""),
-            "short video",
-            f"{category.lower()} facts"
+            DEFAULT_TAGS[0],
+            category_lower,
+            topic_slug,
+            DEFAULT_TAGS[1],
+            f"{category_lower} facts"
         ]
         
         metadata = (title, description, tags)
@@ -47,9 +113,9 @@ def generate_video_metadata(topic: str, category: str, script: str = '') -> tupl
         logger.error(f"❌ Failed to generate video metadata: {str(e)}")
         logger.debug("Stack trace:", exc_info=True)
         fallback_metadata = (
-            topic[:100],
+            topic[:TITLE_MAX_LENGTH],
             f"Explore {topic} in this YouTube Short! #{category.lower()} #youtubeshorts",
-            ['youtube shorts', category.lower()]
+            [DEFAULT_TAGS[0], category.lower()]
         )
         return fallback_metadata
 
@@ -62,33 +128,45 @@ class YouTubeUploader:
         self.credentials_path = credentials_path
         self.token_path = token_path
         self.youtube = None
+        self.credentials = None
         self._authenticate()
     
+    def _client_cache_key(self) -> tuple:
+        """Identify the credentials a client was built from; a rewritten token file yields a new key"""
+        try:
+            token_mtime = os.stat(self.token_path).st_mtime_ns
+        except OSError:
+            token_mtime = None
+        return (os.path.abspath(self.credentials_path), os.path.abspath(self.token_path), token_mtime)
+    
     def _authenticate(self):
         """Authenticate with YouTube API using OAuth 2.0 credentials"""
+        with _CLIENT_CACHE_LOCK:
+            cached_client = _CLIENT_CACHE.get(self._client_cache_key())
+        if cached_client is not None:
+            self.youtube, self.credentials = cached_client
+            logger.info("✅ Reusing authenticated YouTube API client")
+            return
+        
         try:
-            credentials = None
+            from googleapiclient.discovery import build
             
-            # Check for credentials.json
-            if not os.path.exists(self.credentials_path):
-                logger.error(f"❌ Credentials file not found: {self.credentials_path}")
-                raise FileNotFoundError(f"Credentials file not found: {self.credentials_path}")
+            credentials = None
             
             # Load existing token if available
             if os.path.exists(self.token_path):
-                logger.info(f"🔍 Loading saved OAuth 2.0 token from {self.token_path}")
-                with open(self.token_path, 'rb') as token:
-                    credentials = pickle.load(token)
+                logger.info("🔍 Loading saved OAuth 2.0 token from %s", self.token_path)
+                credentials = self._load_token()
                 
                 # Check if credentials are valid or can be refreshed
                 if credentials and credentials.valid:
                     logger.info("✅ Valid credentials loaded from token.pickle")
                 elif credentials and credentials.expired and credentials.refresh_token:
                     logger.info("🔄 Refreshing expired OAuth 2.0 token")
+                    from google.auth.transport.requests import Request
                     credentials.refresh(Request())
-                    with open(self.token_path, 'wb') as token:
-                        pickle.dump(credentials, token)
-                        logger.info(f"✅ Saved refreshed OAuth 2.0 token to {self.token_path}")
+                    self._save_token(credentials)
+                    logger.info("✅ Saved refreshed OAuth 2.0 token to %s", self.token_path)
                 else:
                     logger.error("❌ Invalid or expired OAuth 2.0 token in token.pickle")
                     credentials = None
@@ -100,13 +178,22 @@ class YouTubeUploader:
                     raise RuntimeError("Authentication requires a pre-existing token.pickle in CI/CD")
                 else:
                     logger.info("🔐 Initiating OAuth 2.0 user consent flow")
-                    flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.SCOPES)
+                    from google_auth_oauthlib.flow import InstalledAppFlow
+                    try:
+                        flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, self.SCOPES)
+                    except FileNotFoundError:
+                        logger.error(f"❌ Credentials file not found: {self.credentials_path}")
+                        raise
                     credentials = flow.run_local_server(port=0)
-                    with open(self.token_path, 'wb') as token:
-                        pickle.dump(credentials, token)
-                        logger.info(f"✅ Saved new OAuth 2.0 token to {self.token_path}")
+                    self._save_token(credentials)
+                    logger.info("✅ Saved new OAuth 2.0 token to %s", self.token_path)
             
-            self.youtube = build('youtube', 'v3', credentials=credentials)
+            # Use the discovery document bundled with googleapiclient instead of fetching it over HTTPS
+            self.youtube = build('youtube', 'v3', credentials=credentials,
+                                 static_discovery=True, cache_discovery=False)
+            with _CLIENT_CACHE_LOCK:
+                _CLIENT_CACHE[self._client_cache_key()] = (self.youtube, credentials)
+            self.credentials = credentials
             logger.info("✅ YouTube API client initialized successfully")
         
         except Exception as e:
@@ -115,23 +202,95 @@ class YouTubeUploader:
             self.youtube = None
             raise RuntimeError("YouTube authentication failed")
     
+    def _load_token(self):
+        """Load saved credentials; tokens are stored as JSON, older pickled tokens are still accepted"""
+        with open(self.token_path, 'rb') as token:
+            data = token.read()
+        if data.lstrip().startswith(b'{'):
+            from google.oauth2.credentials import Credentials
+            return Credentials.from_authorized_user_info(json.loads(data), self.SCOPES)
+        return pickle.loads(data)
+    
+    def _save_token(self, credentials):
+        """Atomically save credentials as authorized-user JSON, so concurrent readers never see a partial token"""
+        tmp_path = f"{self.token_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as token:
+            token.write(credentials.to_json())
+        os.replace(tmp_path, self.token_path)
+    
+    def _resumable_upload(self, request, num_retries: int = 5, deadline: float = None) -> dict:
+        """Drive a resumable insert chunk by chunk, letting googleapiclient back off and resume on transient errors.
+        
+        deadline (a time.monotonic() value) is checked before every chunk, so time spent in
+        googleapiclient's own num_retries backoff counts against the upload budget too.
+        """
+        response = None
+        last_logged = 0
+        http = _thread_http(self.credentials)  # Safe for upload_video calls from several threads
+        while response is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Upload exceeded YT_UPLOAD_DEADLINE ({UPLOAD_DEADLINE}s)")
+            status, response = request.next_chunk(http=http, num_retries=num_retries)
+            if status:
+                percent = int(status.progress() * 100)
+                if percent - last_logged >= 10:
+                    logger.info("📤 Upload progress: %d%%", percent)
+                    last_logged = percent
+        return response
+    
+    def _upload_thumbnail(self, video_id: str, thumbnail_path: str) -> bool:
+        """Set a video's thumbnail from a single in-memory read, typed by its content rather than its extension; runs on _POST_UPLOAD_POOL"""
+        from googleapiclient.http import MediaInMemoryUpload
+        try:
+            with open(thumbnail_path, 'rb') as f:
+                image = f.read()
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Thumbnail not found, skipping: {thumbnail_path}")
+            return False
+        
+        # Frames are saved as JPEG even when named .png
+        mimetype = 'image/jpeg' if image.startswith(b'\xff\xd8') else 'image/png'
+        try:
+            logger.info("🖼️ Uploading thumbnail: %s", thumbnail_path)
+            self.youtube.thumbnails().set(
+                videoId=video_id,
+                media_body=MediaInMemoryUpload(image, mimetype=mimetype)
+            ).execute(http=_thread_http(self.credentials))
+            logger.info("✅ Thumbnail uploaded successfully")
+            return True
+        except Exception as thumb_error:
+            logger.warning(f"⚠️ Failed to upload thumbnail: {thumb_error}")
+            return False
+    
     def upload_video(self, video_path: str, thumbnail_path: str, title: str, description: str, 
                     tags: list = None, category_id: str = '24', privacy_status: str = 'public', 
-                    max_retries: int = 5) -> tuple:
-        """Upload a video to YouTube with retry logic and thumbnail support"""
+                    max_retries: int = 5, chunksize: int = None) -> tuple:
+        """Upload a video to YouTube with retry logic and thumbnail support.
+        
+        chunksize is the resumable chunk size in bytes (a multiple of 256 KiB) or -1 for one streamed
+        request; by default files up to SINGLE_REQUEST_MAX_SIZE are streamed whole, larger ones use UPLOAD_CHUNK_SIZE.
+        """
         if not self.youtube:
             logger.error("❌ YouTube client not initialized")
             return False, None
         
-        if not os.path.exists(video_path):
+        try:
+            video_size = os.stat(video_path).st_size
+        except OSError:
             logger.error(f"❌ Video file not found: {video_path}")
             return False, None
+        if video_size == 0:
+            logger.error(f"❌ Video file is empty: {video_path}")
+            return False, None
+        
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaIoBaseUpload
         
         body = {
             'snippet': {
-                'title': title[:100],  # YouTube title limit is 100 characters
-                'description': description[:5000],  # YouTube description limit is 5000 characters
-                'tags': tags or ['youtube shorts', 'short video'],
+                'title': title[:TITLE_MAX_LENGTH],
+                'description': description[:DESCRIPTION_MAX_LENGTH],
+                'tags': tags or list(DEFAULT_TAGS),
                 'categoryId': category_id
             },
             'status': {
@@ -140,56 +299,65 @@ class YouTubeUploader:
             }
         }
         
-        media = MediaFileUpload(video_path, chunksize=1024*1024, resumable=True)
-        
-        for attempt in range(max_retries):
-            try:
-                logger.info(f"📤 Uploading video (attempt {attempt + 1}/{max_retries})...")
-                request = self.youtube.videos().insert(
-                    part='snippet,status',
-                    body=body,
-                    media_body=media
-                )
-                response = request.execute()
-                video_id = response.get('id')
-                logger.info(f"✅ Video uploaded successfully! Video ID: {video_id}")
-                
-                # Save video metadata
-                metadata = {
-                    'video_id': video_id,
-                    'title': title,
-                    'description': description,
-                    'upload_time': datetime.now().isoformat(),
-                    'video_path': video_path,
-                    'thumbnail_path': thumbnail_path
-                }
-                metadata_path = Path(video_path).with_suffix('.metadata.json')
-                with open(metadata_path, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2)
-                logger.info(f"✅ Metadata saved to {metadata_path}")
+        # Stream from a handle we own so the descriptor is closed when the upload finishes
+        deadline = None  # Starts once an upload slot is held; queueing behind other uploads is free
+        with open(video_path, 'rb') as video_file:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(video_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            if chunksize is None:
+                chunksize = -1 if video_size <= SINGLE_REQUEST_MAX_SIZE else UPLOAD_CHUNK_SIZE
+            media = MediaIoBaseUpload(video_file, mimetype='video/mp4', chunksize=chunksize, resumable=True)
+            
+            for attempt in range(max_retries):
+                try:
+                    logger.info("📤 Uploading video (attempt %d/%d)...", attempt + 1, max_retries)
+                    request = self.youtube.videos().insert(
+                        part='snippet,status',
+                        body=body,
+                        media_body=media
+                    )
+                    with _UPLOAD_SLOTS:
+                        if deadline is None:
+                            deadline = time.monotonic() + UPLOAD_DEADLINE
+                        response = self._resumable_upload(request, deadline=deadline)
+                    video_id = response.get('id')
+                    logger.info("✅ Video uploaded successfully! Video ID: %s", video_id)
                 
-                # Set thumbnail if provided
-                if thumbnail_path and os.path.exists(thumbnail_path):
+                    # Save video metadata
+                    metadata = {
+                        'video_id': video_id,
+                        'title': title,
+                        'description': description,
+                        'upload_time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                        'video_path': video_path,
+                        'thumbnail_path': thumbnail_path
+                    }
+                    # Serialize here so a bad value fails loudly on the caller, not inside the pool
                     try:
-                        logger.info(f"🖼️ Uploading thumbnail: {thumbnail_path}")
-                        thumb_media = MediaFileUpload(thumbnail_path)
-                        self.youtube.thumbnails().set(
-                            videoId=video_id,
-                            media_body=thumb_media
-                        ).execute()
-                        logger.info("✅ Thumbnail uploaded successfully")
-                    except Exception as thumb_error:
-                        logger.warning(f"⚠️ Failed to upload thumbnail: {thumb_error}")
+                        payload = json.dumps(metadata, indent=2)
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"⚠️ Could not serialize metadata for {video_id}: {e}")
+                    else:
+                        _POST_UPLOAD_POOL.submit(_write_upload_metadata, Path(video_path).with_suffix('.metadata.json'), payload)
                 
-                return True, video_id
+                    # Set thumbnail if provided, without holding the caller on a second round trip
+                    if thumbnail_path:
+                        _POST_UPLOAD_POOL.submit(self._upload_thumbnail, video_id, thumbnail_path)
+                
+                    return True, video_id
             
-            except Exception as e:
-                logger.error(f"❌ Upload failed (attempt {attempt + 1}): {str(e)}")
-                if attempt < max_retries - 1:
-                    logger.warning(f"Retrying in {2 ** attempt} seconds...")
-                    time.sleep(2 ** attempt)
-                else:
-                    logger.error("❌ Max retries reached. Upload failed.")
-                    return False, None
+                except Exception as e:
+                    logger.error(f"❌ Upload failed (attempt {attempt + 1}): {str(e)}")
+                    if isinstance(e, HttpError) and e.resp.status not in RETRYABLE_STATUS_CODES:
+                        logger.error(f"❌ Non-retryable HTTP {e.resp.status}. Upload failed.")
+                        return False, None
+                    # Full jitter keeps parallel uploaders from retrying in lockstep
+                    delay = round(random.uniform(0, min(MAX_RETRY_DELAY, 2 ** attempt)), 1)
+                    if attempt < max_retries - 1 and (deadline is None or time.monotonic() + delay < deadline):
+                        logger.warning(f"Retrying in {delay} seconds...")
+                        time.sleep(delay)
+                    else:
+                        logger.error("❌ Retry budget exhausted. Upload failed.")
+                        return False, None
         
         return False, None
\ No newline at end of file